@@ -2,6 +2,7 @@
 from flask import Flask
 from flask_cors import CORS
 from config import config
+from app.utils.json_provider import OrjsonProvider
 import os
 
 def create_app(config_name=None):
@@ -10,6 +11,7 @@ def create_app(config_name=None):
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = OrjsonProvider(app)
     
     # Initialize extensions
     CORS(app)
@@ -17,6 +19,12 @@ def create_app(config_name=None):
     # Initialize configuration
     config[config_name].init_app(app)
     
+    # Optionally resolve NLTK data before workers fork so they share the result;
+    # off by default to keep NLTK out of the app's cold start
+    if app.config.get('PRELOAD_NLTK_DATA'):
+        from app.ml.sentiment_analyzer import SentimentAnalyzer
+        SentimentAnalyzer.ensure_corpora()
+    
     # Register blueprints
     from app.routes.main import main as main_blueprint
     app.register_blueprint(main_blueprint)
@@ -1,27 +1,84 @@
 # app/ml/recommendation_engine.py
 import numpy as np
 from typing import Dict, List, Tuple
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
+import joblib
 import pickle
 import os
+import threading
 from flask import current_app
 
+# Synthetic training data for different location scenarios
+# Features: [foot_traffic, competition_density, demographic_match, category_gaps_count]
+_SYNTHETIC_TRAINING_DATA = np.array([
+    # High-potential locations
+    [90, 80, 85, 3], [85, 75, 90, 2], [88, 85, 80, 4],
+    # Medium-potential locations
+    [60, 60, 65, 2], [55, 70, 60, 1], [65, 55, 70, 2],
+    # Low-potential locations
+    [30, 20, 40, 0], [25, 30, 35, 1], [35, 25, 30, 0],
+    # High-competition areas
+    [80, 30, 70, 1], [75, 25, 65, 0], [85, 20, 75, 2],
+    # Tourist areas
+    [95, 50, 60, 3], [90, 45, 55, 4], [85, 55, 65, 2]
+], dtype=np.float32)
+
+# Descriptions indexed by cluster id
+CLUSTER_DESCRIPTIONS = (
+    "High-Potential Location",
+    "Medium-Potential Location",
+    "Low-Potential Location",
+    "High-Competition Area",
+    "Tourist/Event Area"
+)
+
 class RecommendationEngine:
     def __init__(self):
-        self.scaler = StandardScaler()
-        self.model = None
-        self.model_path = current_app.config.get('RECOMMENDATION_MODEL_PATH')
-        self._load_or_create_model()
+        self._scaler = None
+        self._model = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+    
+    @property
+    def model_path(self) -> str:
+        return current_app.config.get('RECOMMENDATION_MODEL_PATH')
+    
+    @property
+    def model(self):
+        self._ensure_loaded()
+        return self._model
+    
+    @property
+    def scaler(self):
+        self._ensure_loaded()
+        return self._scaler
+    
+    def _ensure_loaded(self):
+        """Load or train the model on first access"""
+        if self._loaded:
+            return
+        
+        # One AIService is shared across request threads; only one of them trains
+        with self._load_lock:
+            if not self._loaded:
+                self._load_or_create_model()
+                self._loaded = True
     
     def _load_or_create_model(self):
         """Load existing model or create new one"""
         if os.path.exists(self.model_path):
             try:
-                with open(self.model_path, 'rb') as f:
-                    model_data = pickle.load(f)
-                    self.model = model_data['model']
-                    self.scaler = model_data['scaler']
+                # Memory-map the fitted arrays so workers share pages read-only
+                model_data = joblib.load(self.model_path, mmap_mode='r')
+                if isinstance(model_data, dict):
+                    # Legacy pickle format - convert to the joblib layout
+                    self._model = model_data['model']
+                    self._scaler = model_data['scaler']
+                    self._save_model()
+                else:
+                    self._model, self._scaler = model_data
+                self._use_float32_centers()
             except Exception as e:
                 current_app.logger.error(f"Failed to load model: {str(e)}")
                 self._create_default_model()
@@ -30,75 +87,62 @@ class RecommendationEngine:
     
     def _create_default_model(self):
         """Create a default clustering model"""
-        # Generate synthetic training data for different location types
-        synthetic_data = self._generate_synthetic_training_data()
-        
-        # Train clustering model
-        features = np.array(synthetic_data)
-        self.scaler.fit(features)
-        scaled_features = self.scaler.transform(features)
+        # Train clustering model on the synthetic location scenarios
+        self._scaler = StandardScaler()
+        self._scaler.fit(_SYNTHETIC_TRAINING_DATA)
+        scaled_features = self._scaler.transform(_SYNTHETIC_TRAINING_DATA).astype(np.float32, copy=False)
         
-        self.model = KMeans(n_clusters=5, random_state=42)
-        self.model.fit(scaled_features)
+        self._model = MiniBatchKMeans(n_clusters=5, random_state=42, n_init=3, batch_size=256)
+        self._model.fit(scaled_features)
+        self._use_float32_centers()
         
         # Save model
         self._save_model()
     
-    def _generate_synthetic_training_data(self) -> List[List[float]]:
-        """Generate synthetic training data for different location scenarios"""
-        # Features: [foot_traffic, competition_density, demographic_match, category_gaps_count]
-        data = [
-            # High-potential locations
-            [90, 80, 85, 3], [85, 75, 90, 2], [88, 85, 80, 4],
-            # Medium-potential locations  
-            [60, 60, 65, 2], [55, 70, 60, 1], [65, 55, 70, 2],
-            # Low-potential locations
-            [30, 20, 40, 0], [25, 30, 35, 1], [35, 25, 30, 0],
-            # High-competition areas
-            [80, 30, 70, 1], [75, 25, 65, 0], [85, 20, 75, 2],
-            # Tourist areas
-            [95, 50, 60, 3], [90, 45, 55, 4], [85, 55, 65, 2]
-        ]
-        return data
+    def _use_float32_centers(self):
+        """Keep centers in float32 so transform runs single-precision end to end"""
+        self._model.cluster_centers_ = self._model.cluster_centers_.astype(np.float32, copy=False)
     
     def predict_location_cluster(self, foot_traffic: float, competition_density: float,
                                demographic_match: float, category_gaps_count: int) -> Dict:
         """Predict which cluster/type a location belongs to"""
+        features = np.array([[foot_traffic, competition_density, demographic_match, category_gaps_count]])
+        return self.predict_location_clusters(features)[0]
+    
+    def predict_location_clusters(self, features: np.ndarray) -> List[Dict]:
+        """Predict clusters for a batch of locations given an (N, 4) feature array"""
+        features = np.atleast_2d(np.asarray(features, dtype=np.float32))
+        
+        if len(features) == 0:
+            return []
+        
         if not self.model:
-            return {'cluster': 0, 'confidence': 0.5}
+            return [{'cluster': 0, 'confidence': 0.5} for _ in range(len(features))]
         
-        features = np.array([[foot_traffic, competition_density, demographic_match, category_gaps_count]])
-        scaled_features = self.scaler.transform(features)
+        scaled_features = self.scaler.transform(features).astype(np.float32, copy=False)
         
-        cluster = self.model.predict(scaled_features)[0]
+        # One distance matrix for the whole batch; closest center is the cluster
+        distances = self.model.transform(scaled_features).astype(np.float32, copy=False)
+        clusters = distances.argmin(axis=1)
         
         # Calculate confidence based on distance to cluster center
-        distances = self.model.transform(scaled_features)[0]
-        min_distance = min(distances)
-        confidence = max(0, 1 - (min_distance / np.max(distances)))
+        confidences = np.maximum(0, 1 - distances.min(axis=1) / distances.max(axis=1))
         
-        cluster_descriptions = {
-            0: "High-Potential Location",
-            1: "Medium-Potential Location", 
-            2: "Low-Potential Location",
-            3: "High-Competition Area",
-            4: "Tourist/Event Area"
-        }
-        
-        return {
-            'cluster': int(cluster),
-            'cluster_description': cluster_descriptions.get(cluster, "Unknown"),
-            'confidence': float(confidence)
-        }
+        return [
+            {
+                'cluster': int(cluster),
+                'cluster_description': (CLUSTER_DESCRIPTIONS[cluster]
+                                        if 0 <= cluster < len(CLUSTER_DESCRIPTIONS) else "Unknown"),
+                'confidence': float(confidence)
+            }
+            for cluster, confidence in zip(clusters, confidences)
+        ]
     
     def _save_model(self):
         """Save the trained model"""
         try:
             os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            with open(self.model_path, 'wb') as f:
-                pickle.dump({
-                    'model': self.model,
-                    'scaler': self.scaler
-                }, f)
+            joblib.dump((self._model, self._scaler), self.model_path, compress=0,
+                        protocol=pickle.HIGHEST_PROTOCOL)
         except Exception as e:
             current_app.logger.error(f"Failed to save model: {str(e)}")
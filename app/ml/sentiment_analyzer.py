@@ -1,44 +1,107 @@
 # app/ml/sentiment_analyzer.py
 import nltk
-from textblob import TextBlob
-from typing import List, Dict, Tuple
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from collections import Counter
+import logging
 import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# While the lexicon is missing, retry building the analyzer at most this often
+_LEXICON_RETRY_INTERVAL = 60.0  # seconds
+_analyzer: Optional[SentimentIntensityAnalyzer] = None
+_analyzer_retry_at = 0.0
+_analyzer_lock = threading.Lock()
+
+def _intensity_analyzer() -> Optional[SentimentIntensityAnalyzer]:
+    """Shared VADER analyzer, or None while the lexicon is not installed"""
+    global _analyzer, _analyzer_retry_at
+    if _analyzer is not None:
+        return _analyzer
+    
+    with _analyzer_lock:
+        if _analyzer is None and time.monotonic() >= _analyzer_retry_at:
+            try:
+                _analyzer = SentimentIntensityAnalyzer()
+            except LookupError:
+                _analyzer_retry_at = time.monotonic() + _LEXICON_RETRY_INTERVAL
+                logger.error("VADER lexicon not found; scoring tips as neutral until it is installed")
+    return _analyzer
+
+@lru_cache(maxsize=50000)
+def _vader_polarity(text: str) -> float:
+    return _analyzer.polarity_scores(text)['compound']
+
+def _polarity(text: str) -> float:
+    """VADER compound polarity (-1 to 1) for text, memoized across requests"""
+    # Neutral scores are not memoized, so tips are rescored once the lexicon appears
+    if _intensity_analyzer() is None:
+        return 0.0
+    return _vader_polarity(text)
 
 class SentimentAnalyzer:
+    # Common words filtered out of keyword extraction
+    _STOP_WORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'was', 'are', 'were', 'a', 'an'})
+    # Words longer than three characters that are not stop words, in one regex scan
+    _WORD_RE = re.compile(
+        r'\b(?!(?:%s)\b)\w{4,}\b' % '|'.join(sorted(w for w in _STOP_WORDS if len(w) > 3))
+    )
+    
+    _corpora_ready = False
+    
     def __init__(self):
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
+        self.ensure_corpora()
+    
+    @classmethod
+    def ensure_corpora(cls):
+        """Locate (or download) the VADER lexicon once per process"""
+        if cls._corpora_ready:
+            return
         
         try:
-            nltk.data.find('corpora/vader_lexicon')
+            nltk.data.find('sentiment/vader_lexicon.zip')
         except LookupError:
-            nltk.download('vader_lexicon', quiet=True)
+            if not nltk.download('vader_lexicon', quiet=True):
+                return
+            try:
+                nltk.data.find('sentiment/vader_lexicon.zip')
+            except LookupError:
+                return
+        
+        cls._corpora_ready = True
+        
+        # Build the analyzer on the next tip instead of waiting out the retry interval
+        global _analyzer_retry_at
+        _analyzer_retry_at = 0.0
     
     def analyze_tips_sentiment(self, tips: List[Dict]) -> Dict:
         """Analyze sentiment of place tips/reviews"""
         if not tips:
             return {'sentiment_score': 0.5, 'insights': []}
         
-        sentiments = []
-        positive_keywords = []
-        negative_keywords = []
+        total_sentiment = 0.0
+        scored_tips = 0
+        positive_keywords = Counter()
+        negative_keywords = Counter()
         
         for tip in tips:
             text = tip.get('text', '')
             if text:
-                blob = TextBlob(text)
-                sentiment = blob.sentiment.polarity
-                sentiments.append(sentiment)
+                sentiment = _polarity(text.strip())
+                total_sentiment += sentiment
+                scored_tips += 1
                 
                 # Extract keywords
                 if sentiment > 0.1:
-                    positive_keywords.extend(self._extract_keywords(text))
+                    positive_keywords.update(self._extract_keywords(text))
                 elif sentiment < -0.1:
-                    negative_keywords.extend(self._extract_keywords(text))
+                    negative_keywords.update(self._extract_keywords(text))
         
-        avg_sentiment = sum(sentiments) / len(sentiments) if sentiments else 0
+        avg_sentiment = total_sentiment / scored_tips if scored_tips else 0
         
         # Normalize to 0-1 scale
         sentiment_score = (avg_sentiment + 1) / 2
@@ -52,24 +115,20 @@ class SentimentAnalyzer:
             'sentiment_score': sentiment_score,
             'total_tips': len(tips),
             'insights': insights,
-            'positive_keywords': list(set(positive_keywords)),
-            'negative_keywords': list(set(negative_keywords))
+            'positive_keywords': list(positive_keywords),
+            'negative_keywords': list(negative_keywords)
         }
     
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract relevant keywords from text"""
         # Simple keyword extraction
-        words = re.findall(r'\b\w+\b', text.lower())
-        
-        # Filter out common words
-        stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'was', 'are', 'were', 'a', 'an'}
-        keywords = [word for word in words if len(word) > 3 and word not in stop_words]
+        keywords = self._WORD_RE.findall(text.lower())
         
         return keywords[:5]  # Return top 5 keywords
     
     def _generate_sentiment_insights(self, sentiment_score: float, 
-                                   positive_keywords: List[str], 
-                                   negative_keywords: List[str]) -> List[str]:
+                                   positive_keywords: Counter, 
+                                   negative_keywords: Counter) -> List[str]:
         """Generate insights from sentiment analysis"""
         insights = []
         
@@ -81,13 +140,13 @@ class SentimentAnalyzer:
             insights.append("Some negative sentiment - investigate common complaints")
         
         if positive_keywords:
-            common_positive = [word for word in positive_keywords if positive_keywords.count(word) > 1]
+            common_positive = [word for word, count in positive_keywords.most_common(3) if count > 1]
             if common_positive:
-                insights.append(f"Customers appreciate: {', '.join(common_positive[:3])}")
+                insights.append(f"Customers appreciate: {', '.join(common_positive)}")
         
         if negative_keywords:
-            common_negative = [word for word in negative_keywords if negative_keywords.count(word) > 1]
+            common_negative = [word for word, count in negative_keywords.most_common(3) if count > 1]
             if common_negative:
-                insights.append(f"Common concerns: {', '.join(common_negative[:3])}")
+                insights.append(f"Common concerns: {', '.join(common_negative)}")
         
         return insights
\ No newline at end of file
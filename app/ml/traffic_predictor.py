@@ -3,40 +3,58 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 
+# Business type traffic patterns (hourly weights 0-23)
+_TRAFFIC_PATTERNS = {
+    'food_truck': {
+        'weekday': [0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.6, 0.8, 0.7, 0.6, 0.9, 1.0, 0.8, 0.6, 0.4, 0.3, 0.7, 0.9, 0.8, 0.6, 0.4, 0.2, 0.1],
+        'weekend': [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3, 0.5, 0.7, 0.8, 0.9, 1.0, 0.9, 0.8, 0.7, 0.6, 0.7, 0.8, 0.7, 0.5, 0.3, 0.2, 0.1]
+    },
+    'retail': {
+        'weekday': [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3, 0.5, 0.7, 0.8, 0.9, 1.0, 0.9, 0.8, 0.7, 0.8, 0.9, 0.7, 0.5, 0.3, 0.2, 0.1, 0.1],
+        'weekend': [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.6, 0.8, 0.9, 1.0, 1.0, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1, 0.1]
+    }
+}
+
+def _readonly_array(weights: List[float]) -> np.ndarray:
+    arr = np.asarray(weights, dtype=np.float32)
+    arr.flags.writeable = False
+    return arr
+
+# Same patterns as contiguous, read-only float32 arrays for vectorized scoring
+_PATTERNS_NP = {
+    business_type: {
+        day_type: _readonly_array(weights)
+        for day_type, weights in pattern.items()
+    }
+    for business_type, pattern in _TRAFFIC_PATTERNS.items()
+}
+
+# Peak hours are fixed per pattern, so format them once at import
+_PEAK_HOURS = {
+    business_type: {
+        f"{day_type}_peaks": tuple(f"{hour:02d}:00" for hour, val in enumerate(weights) if val > 0.7)
+        for day_type, weights in pattern.items()
+    }
+    for business_type, pattern in _TRAFFIC_PATTERNS.items()
+}
+
 class TrafficPredictor:
-    def __init__(self):
-        # Business type traffic patterns (hourly weights 0-23)
-        self.traffic_patterns = {
-            'food_truck': {
-                'weekday': [0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.6, 0.8, 0.7, 0.6, 0.9, 1.0, 0.8, 0.6, 0.4, 0.3, 0.7, 0.9, 0.8, 0.6, 0.4, 0.2, 0.1],
-                'weekend': [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3, 0.5, 0.7, 0.8, 0.9, 1.0, 0.9, 0.8, 0.7, 0.6, 0.7, 0.8, 0.7, 0.5, 0.3, 0.2, 0.1]
-            },
-            'retail': {
-                'weekday': [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.3, 0.5, 0.7, 0.8, 0.9, 1.0, 0.9, 0.8, 0.7, 0.8, 0.9, 0.7, 0.5, 0.3, 0.2, 0.1, 0.1],
-                'weekend': [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.2, 0.4, 0.6, 0.8, 0.9, 1.0, 1.0, 0.9, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1, 0.1]
-            }
-        }
+    traffic_patterns = _TRAFFIC_PATTERNS
+    _patterns_np = _PATTERNS_NP
+    _peaks = _PEAK_HOURS
     
-    def predict_hourly_traffic(self, business_type: str, date: datetime = None) -> List[float]:
-        """Predict hourly traffic for a specific date"""
+    def predict_hourly_traffic(self, business_type: str, date: datetime = None) -> np.ndarray:
+        """Predict hourly traffic for a specific date as a read-only array (call .tolist() for a list)"""
         if date is None:
             date = datetime.now()
         
         is_weekend = date.weekday() >= 5
         day_type = 'weekend' if is_weekend else 'weekday'
         
-        pattern = self.traffic_patterns.get(business_type, self.traffic_patterns['retail'])
+        pattern = self._patterns_np.get(business_type, self._patterns_np['retail'])
         return pattern[day_type]
     
     def get_peak_hours(self, business_type: str) -> Dict:
         """Get peak hours for business type"""
-        weekday_pattern = self.traffic_patterns.get(business_type, self.traffic_patterns['retail'])['weekday']
-        weekend_pattern = self.traffic_patterns.get(business_type, self.traffic_patterns['retail'])['weekend']
-        
-        weekday_peaks = [i for i, val in enumerate(weekday_pattern) if val > 0.7]
-        weekend_peaks = [i for i, val in enumerate(weekend_pattern) if val > 0.7]
-        
-        return {
-            'weekday_peaks': [f"{hour:02d}:00" for hour in weekday_peaks],
-            'weekend_peaks': [f"{hour:02d}:00" for hour in weekend_peaks]
-        }
\ No newline at end of file
+        # Fresh dict over the shared tuples so callers cannot mutate the module table
+        return dict(self._peaks.get(business_type, self._peaks['retail']))
\ No newline at end of file
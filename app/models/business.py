@@ -0,0 +1,54 @@
+# app/models/business.py
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+@dataclass(frozen=True, slots=True)
+class BusinessSpec:
+    competitor_query: str
+    hours: Tuple[str, ...]
+    essentials: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
+    base_requirements: Tuple[str, ...] = ()
+
+DEFAULT_BUSINESS_SPEC = BusinessSpec(
+    competitor_query='business',
+    hours=('09:00-17:00',)
+)
+
+# Everything that varies by business type, looked up once per analysis
+BUSINESS_TYPE_SPEC: Mapping[str, BusinessSpec] = MappingProxyType({
+    'food_truck': BusinessSpec(
+        competitor_query='food truck restaurant fast food',
+        hours=('11:00-14:00', '17:00-21:00'),  # Lunch and dinner
+        essentials=('Coffee Shop', 'Fast Food', 'Grocery Store', 'Bakery'),
+        keywords=('food', 'restaurant', 'cafe', 'truck'),
+        base_requirements=(
+            "Food service permits and licenses",
+            "Mobile kitchen equipment",
+            "Generator or power source"
+        )
+    ),
+    'retail': BusinessSpec(
+        competitor_query='shop store boutique retail',
+        hours=('09:00-18:00',),  # Standard retail hours
+        essentials=('Clothing Store', 'Electronics Store', 'Bookstore', 'Pharmacy'),
+        keywords=('shop', 'store', 'boutique', 'market')
+    ),
+    'service': BusinessSpec(
+        competitor_query='salon service repair',
+        hours=('09:00-17:00',),  # Business hours
+        essentials=('Hair Salon', 'Laundry', 'Bank', 'Post Office'),
+        keywords=('salon', 'repair', 'cleaning', 'consultation')
+    ),
+    'entertainment': BusinessSpec(
+        competitor_query='entertainment music art event',
+        hours=('18:00-23:00',),  # Evening hours
+        essentials=('Cinema', 'Bar', 'Gym', 'Park'),
+        keywords=('music', 'art', 'performance', 'event')
+    )
+})
+
+def get_business_spec(business_type: str) -> BusinessSpec:
+    """Spec for a business type, falling back to the generic default"""
+    return BUSINESS_TYPE_SPEC.get(business_type, DEFAULT_BUSINESS_SPEC)
@@ -2,8 +2,9 @@
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 import json
+import sys
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     lat: float
     lng: float
@@ -40,7 +41,7 @@ class Location:
             postal_code=location_data.get('postcode')
         )
 
-@dataclass
+@dataclass(slots=True)
 class Business:
     fsq_id: str
     name: str
@@ -71,7 +72,8 @@ class Business:
     def from_foursquare_data(cls, data: Dict) -> 'Business':
         """Create Business from Foursquare API response"""
         location = Location.from_foursquare_data(data)
-        categories = [cat.get('name', '') for cat in data.get('categories', [])]
+        # Category names repeat heavily across venues; share one string per name
+        categories = [sys.intern(cat.get('name', '')) for cat in data.get('categories', [])]
         
         return cls(
             fsq_id=data.get('fsq_id', ''),
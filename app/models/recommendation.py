@@ -27,6 +27,15 @@ class LocationInsight:
             'risk_factors': self.risk_factors
         }
 
+@dataclass(frozen=True, slots=True)
+class DerivedMetrics:
+    """Scalars derived once from a LocationInsight for the recommendation helpers"""
+    confidence: float
+    foot_traffic: float
+    competition: float
+    gap_count: int
+    risk_count: int
+
 @dataclass
 class BusinessRecommendation:
     location: Location
@@ -1,12 +1,44 @@
 # app/routes/api.py
 from flask import Blueprint, request, jsonify, current_app
-from app.services.ai_service import AIService
-from app.services.foursquare_service import FoursquareService
 from app.utils.validators import Validators
+import threading
 import time
 
 api = Blueprint('api', __name__)
 
+# Services are built on first use and shared across requests
+_ai_service = None
+_foursquare_service = None
+_file_manager = None
+_services_lock = threading.Lock()
+
+def _get_ai_service():
+    global _ai_service
+    if _ai_service is None:
+        with _services_lock:
+            if _ai_service is None:
+                from app.services.ai_service import AIService
+                _ai_service = AIService()
+    return _ai_service
+
+def _get_foursquare_service():
+    global _foursquare_service
+    if _foursquare_service is None:
+        with _services_lock:
+            if _foursquare_service is None:
+                from app.services.foursquare_service import FoursquareService
+                _foursquare_service = FoursquareService()
+    return _foursquare_service
+
+def _get_file_manager():
+    global _file_manager
+    if _file_manager is None:
+        with _services_lock:
+            if _file_manager is None:
+                from app.utils.file_manager import FileManager
+                _file_manager = FileManager()
+    return _file_manager
+
 @api.route('/analyze', methods=['POST'])
 def analyze_location():
     """API endpoint to analyze a location"""
@@ -32,7 +64,7 @@ def analyze_location():
         business_type = Validators.sanitize_input(business_type)
         
         # Perform analysis
-        ai_service = AIService()
+        ai_service = _get_ai_service()
         result = ai_service.analyze_location(location, business_type, target_demographics)
         
         if 'error' in result:
@@ -60,7 +92,7 @@ def search_places():
         if not Validators.validate_radius(radius):
             return jsonify({'error': 'Invalid radius (100-10000m)'}), 400
         
-        foursquare_service = FoursquareService()
+        foursquare_service = _get_foursquare_service()
         result = foursquare_service.search_places(query, location, radius)
         
         return jsonify(result)
@@ -73,7 +105,7 @@ def search_places():
 def get_place_details(place_id):
     """API endpoint to get place details"""
     try:
-        foursquare_service = FoursquareService()
+        foursquare_service = _get_foursquare_service()
         result = foursquare_service.get_place_details(place_id)
         
         return jsonify(result)
@@ -104,8 +136,7 @@ def save_analytics():
         event_type = data.get('event_type')
         event_data = data.get('data', {})
         
-        from app.utils.file_manager import FileManager
-        file_manager = FileManager()
+        file_manager = _get_file_manager()
         
         success = file_manager.save_analytics_data(event_type, event_data)
         
@@ -122,8 +153,7 @@ def save_analytics():
 def get_analysis(analysis_id):
     """Get saved analysis by ID"""
     try:
-        from app.utils.file_manager import FileManager
-        file_manager = FileManager()
+        file_manager = _get_file_manager()
         
         analysis = file_manager.get_user_analysis(analysis_id)
         
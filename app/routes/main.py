@@ -1,6 +1,5 @@
 # app/routes/main.py
 from flask import Blueprint, render_template, request, jsonify
-from app.services.ai_service import AIService
 from app.utils.validators import Validators
 
 main = Blueprint('main', __name__)
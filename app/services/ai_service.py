@@ -2,16 +2,31 @@
 import json
 import numpy as np
 import time
+from functools import partial
 from typing import Dict, List, Tuple, Optional
 from flask import current_app
 from app.models.location import Location, Business
-from app.models.recommendation import BusinessRecommendation, LocationInsight
+from app.models.business import get_business_spec
+from app.models.recommendation import BusinessRecommendation, LocationInsight, DerivedMetrics
 from app.services.foursquare_service import FoursquareService
 from app.ml.sentiment_analyzer import SentimentAnalyzer
 from app.ml.recommendation_engine import RecommendationEngine
 from app.utils.data_processor import DataProcessor
 from app.utils.file_manager import FileManager
 
+# Target demographic (as sent by clients) -> demographic_analysis key
+_DEMO_MAP: Dict[str, str] = {
+    'families': 'family_friendly',
+    'family': 'family_friendly',
+    'professionals': 'young_professional',
+    'young_professional': 'young_professional',
+    'tourists': 'tourist_area',
+    'tourist': 'tourist_area',
+}
+
+# /places/nearby statuses meaning the bundled category query itself was refused
+_BUNDLE_REJECTED_STATUSES = frozenset({400, 404, 422})
+
 class AIService:
     def __init__(self):
         self.foursquare_service = FoursquareService()
@@ -81,21 +96,46 @@ class AIService:
         """Gather comprehensive data about the area"""
         lat, lng = coords
         
-        # Get nearby businesses
-        nearby_data = self.foursquare_service.search_nearby_categories(lat, lng, radius=1000)
-        businesses = nearby_data.get('results', [])
-        
-        # Get specific competitor data
-        competitor_query = self._get_competitor_query(business_type)
-        competitor_data = self.foursquare_service.search_places(
-            competitor_query, f"{lat},{lng}", radius=1000, limit=30
+        # One nearby call covering every category, partitioned client-side
+        bundle = self.foursquare_service.search_area_bundle(lat, lng, radius=1000)
+        if 'error' in bundle:
+            # Only a rejected bundled query is worth retrying as separate searches;
+            # timeouts, auth failures, rate limits and outages would fail those too
+            if bundle.get('status') in _BUNDLE_REJECTED_STATUSES:
+                return self._get_area_data_per_query(coords, business_type)
+            return {'all_businesses': [], 'competitors': [], 'attractions': [], 'total_venues': 0}
+        
+        businesses = bundle.get('results', [])
+        competitors = [b for b in businesses if self.data_processor._is_competitor(b, business_type)]
+        attractions = sorted(
+            (b for b in businesses if self.data_processor._is_attraction(b)),
+            key=lambda b: b.get('popularity') or 0, reverse=True
         )
-        competitors = competitor_data.get('results', [])
         
-        # Get area attractions and amenities
-        attraction_data = self.foursquare_service.search_places(
-            "popular attractions restaurants", f"{lat},{lng}", radius=1000, limit=20
+        return {
+            'all_businesses': businesses,
+            'competitors': competitors,
+            'attractions': attractions,
+            'total_venues': len(businesses)
+        }
+    
+    def _get_area_data_per_query(self, coords: Tuple[float, float], 
+                                 business_type: str) -> Dict:
+        """Fallback: gather area data with separate nearby, competitor and attraction searches"""
+        lat, lng = coords
+        competitor_query = get_business_spec(business_type).competitor_query
+        
+        # Nearby businesses, competitors and attractions are independent lookups
+        nearby_data, competitor_data, attraction_data = self.foursquare_service.run_concurrently(
+            partial(self.foursquare_service.search_nearby_categories, lat, lng, radius=1000),
+            partial(self.foursquare_service.search_places,
+                    competitor_query, f"{lat},{lng}", radius=1000, limit=30),
+            partial(self.foursquare_service.search_places,
+                    "popular attractions restaurants", f"{lat},{lng}", radius=1000, limit=20)
         )
+        
+        businesses = nearby_data.get('results', [])
+        competitors = competitor_data.get('results', [])
         attractions = attraction_data.get('results', [])
         
         return {
@@ -105,16 +145,6 @@ class AIService:
             'total_venues': len(businesses)
         }
     
-    def _get_competitor_query(self, business_type: str) -> str:
-        """Get search query for competitors based on business type"""
-        queries = {
-            'food_truck': 'food truck restaurant fast food',
-            'retail': 'shop store boutique retail',
-            'service': 'salon service repair',
-            'entertainment': 'entertainment music art event'
-        }
-        return queries.get(business_type, 'business')
-    
     def _generate_location_insights(self, coords: Tuple[float, float], 
                                   area_data: Dict, business_type: str,
                                   target_demographics: List[str]) -> LocationInsight:
@@ -124,17 +154,20 @@ class AIService:
         competitors = area_data['competitors']
         attractions = area_data['attractions']
         
+        # Extract venue fields once and share them across the analyzers
+        venues = self.data_processor.materialize(businesses)
+        
         # Calculate metrics
-        foot_traffic_score = self.data_processor.calculate_foot_traffic_score(businesses, coords)
+        foot_traffic_score = self.data_processor.calculate_foot_traffic_score(venues, coords)
         competition_analysis = self.data_processor.analyze_competition_density(coords, competitors, business_type)
-        demographic_analysis = self.data_processor.analyze_demographic_patterns(businesses)
-        category_gaps = self.data_processor.identify_category_gaps(businesses, business_type)
+        demographic_analysis = self.data_processor.analyze_demographic_patterns(venues)
+        category_gaps = self.data_processor.identify_category_gaps(venues, business_type)
         
         # Calculate demographic match
         demographic_match = self._calculate_demographic_match(demographic_analysis, target_demographics or [])
         
-        # Generate optimal hours prediction
-        optimal_hours = self._predict_optimal_hours(businesses, business_type)
+        # Optimal hours come straight from the business type spec
+        optimal_hours = list(get_business_spec(business_type).hours)
         
         # Identify nearby attractions
         nearby_attractions = [attr.get('name', '') for attr in attractions[:5]]
@@ -161,39 +194,14 @@ class AIService:
         if not target_demographics:
             return 70.0  # Default neutral score
         
+        # Every target carries the same weight, so the match is a plain mean;
+        # unknown demographics contribute a neutral 50
         score = 0
-        total_weight = 0
-        
         for demographic in target_demographics:
-            weight = 25
-            if demographic.lower() in ['families', 'family']:
-                score += demographic_analysis.get('family_friendly', 0) * weight
-            elif demographic.lower() in ['professionals', 'young_professional']:
-                score += demographic_analysis.get('young_professional', 0) * weight
-            elif demographic.lower() in ['tourists', 'tourist']:
-                score += demographic_analysis.get('tourist_area', 0) * weight
-            else:
-                score += 50 * weight  # Default score
-            
-            total_weight += weight
+            key = _DEMO_MAP.get(demographic.lower())
+            score += demographic_analysis.get(key, 0) if key else 50
         
-        return min(100, score / total_weight if total_weight > 0 else 50)
-    
-    def _predict_optimal_hours(self, businesses: List[Dict], business_type: str) -> List[str]:
-        """Predict optimal operating hours based on area patterns"""
-        # Analyze operating hours of similar businesses
-        similar_businesses = [b for b in businesses if self.data_processor._is_competitor(b, business_type)]
-        
-        if business_type == 'food_truck':
-            return ['11:00-14:00', '17:00-21:00']  # Lunch and dinner
-        elif business_type == 'retail':
-            return ['09:00-18:00']  # Standard retail hours
-        elif business_type == 'service':
-            return ['09:00-17:00']  # Business hours
-        elif business_type == 'entertainment':
-            return ['18:00-23:00']  # Evening hours
-        
-        return ['09:00-17:00']  # Default
+        return min(100, score / len(target_demographics))
     
     def _identify_risk_factors(self, competition_analysis: Dict, 
                              demographic_analysis: Dict, foot_traffic_score: float) -> List[str]:
@@ -218,20 +226,21 @@ class AIService:
                                      insights: LocationInsight, 
                                      business_type: str) -> BusinessRecommendation:
         """Create final business recommendation"""
-        # Calculate overall confidence score
-        confidence_score = self._calculate_confidence_score(insights)
+        # Derive the shared scalars (including overall confidence) once
+        metrics = self._derive_metrics(insights)
+        confidence_score = metrics.confidence
         
         # Generate reasoning
-        reasoning = self._generate_reasoning(insights, business_type)
+        reasoning = self._generate_reasoning(insights, business_type, metrics)
         
         # Estimate revenue potential
-        revenue_potential = self._estimate_revenue_potential(insights, business_type)
+        revenue_potential = self._estimate_revenue_potential(metrics, business_type)
         
         # Generate setup requirements
-        setup_requirements = self._generate_setup_requirements(insights, business_type)
+        setup_requirements = self._generate_setup_requirements(metrics, business_type)
         
         # Recommend duration
-        recommended_duration = self._recommend_duration(confidence_score, insights)
+        recommended_duration = self._recommend_duration(metrics)
         
         return BusinessRecommendation(
             location=insights.location,
@@ -243,6 +252,16 @@ class AIService:
             recommended_duration=recommended_duration
         )
     
+    def _derive_metrics(self, insights: LocationInsight) -> DerivedMetrics:
+        """Compute the values several recommendation helpers depend on"""
+        return DerivedMetrics(
+            confidence=self._calculate_confidence_score(insights),
+            foot_traffic=insights.foot_traffic_score,
+            competition=insights.competition_density,
+            gap_count=len(insights.category_gaps),
+            risk_count=len(insights.risk_factors)
+        )
+    
     def _calculate_confidence_score(self, insights: LocationInsight) -> float:
         """Calculate overall confidence score"""
         weights = {
@@ -261,21 +280,22 @@ class AIService:
         
         return min(100, max(0, score))
     
-    def _generate_reasoning(self, insights: LocationInsight, business_type: str) -> str:
+    def _generate_reasoning(self, insights: LocationInsight, business_type: str,
+                            metrics: DerivedMetrics) -> str:
         """Generate human-readable reasoning for the recommendation"""
         reasons = []
         
-        if insights.foot_traffic_score > 70:
+        if metrics.foot_traffic > 70:
             reasons.append("High foot traffic from nearby popular venues")
-        elif insights.foot_traffic_score < 30:
+        elif metrics.foot_traffic < 30:
             reasons.append("Low foot traffic may require strong marketing")
         
-        if insights.competition_density > 70:
+        if metrics.competition > 70:
             reasons.append("Low competition provides market opportunity")
-        elif insights.competition_density < 30:
+        elif metrics.competition < 30:
             reasons.append("High competition requires strong differentiation")
         
-        if insights.category_gaps:
+        if metrics.gap_count:
             reasons.append(f"Market gaps identified: {', '.join(insights.category_gaps[:3])}")
         
         if insights.nearby_attractions:
@@ -283,9 +303,9 @@ class AIService:
         
         return ". ".join(reasons) if reasons else "Standard market conditions observed"
     
-    def _estimate_revenue_potential(self, insights: LocationInsight, business_type: str) -> str:
+    def _estimate_revenue_potential(self, metrics: DerivedMetrics, business_type: str) -> str:
         """Estimate revenue potential category"""
-        confidence = self._calculate_confidence_score(insights)
+        confidence = metrics.confidence
         
         if confidence > 80:
             return "High ($2000-5000/week)"
@@ -296,33 +316,26 @@ class AIService:
         else:
             return "Low-Medium ($200-500/week)"
     
-    def _generate_setup_requirements(self, insights: LocationInsight, business_type: str) -> List[str]:
+    def _generate_setup_requirements(self, metrics: DerivedMetrics, business_type: str) -> List[str]:
         """Generate setup requirements based on analysis"""
-        requirements = []
-        
-        if business_type == 'food_truck':
-            requirements.extend([
-                "Food service permits and licenses",
-                "Mobile kitchen equipment",
-                "Generator or power source"
-            ])
+        requirements = list(get_business_spec(business_type).base_requirements)
         
-        if insights.competition_density < 50:
+        if metrics.competition < 50:
             requirements.append("Strong branding to stand out from competition")
         
-        if insights.foot_traffic_score < 50:
+        if metrics.foot_traffic < 50:
             requirements.append("Marketing strategy for customer acquisition")
         
-        if len(insights.risk_factors) > 2:
+        if metrics.risk_count > 2:
             requirements.append("Risk mitigation strategy")
         
         return requirements
     
-    def _recommend_duration(self, confidence_score: float, insights: LocationInsight) -> str:
+    def _recommend_duration(self, metrics: DerivedMetrics) -> str:
         """Recommend operating duration"""
-        if confidence_score > 70:
+        if metrics.confidence > 70:
             return "2-4 weeks for market validation, potential for longer"
-        elif confidence_score > 50:
+        elif metrics.confidence > 50:
             return "1-2 weeks with careful monitoring"
         else:
             return "3-5 days trial period recommended"
\ No newline at end of file
@@ -1,12 +1,45 @@
 # app/services/foursquare_service.py
 import requests
-import json
+import orjson
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, List, Optional, Tuple
 from flask import current_app
 from app.utils.file_manager import FileManager
 from app.utils.data_processor import DataProcessor
 
+# Process-wide HTTP session so every service instance and worker thread shares one connection pool
+_session = None
+_session_lock = threading.Lock()
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20))
+            _session = session
+    return _session
+
+NEARBY_CATEGORIES = [
+    '13065',  # Food & Beverage
+    '17069',  # Retail
+    '10032',  # Entertainment
+    '12022',  # Professional Services
+    '19014'   # Transportation
+]
+
+# Nearby categories plus attractions, so one call can feed the whole area analysis
+AREA_BUNDLE_CATEGORIES = NEARBY_CATEGORIES + [
+    '10000',  # Arts & Entertainment
+    '16000'   # Landmarks & Outdoors
+]
+
+# Shared pool for fanning out independent API calls; sized to the HTTP connection pool
+_executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix='foursquare')
+
 class FoursquareService:
     def __init__(self):
         self.api_key = current_app.config['FOURSQUARE_API_KEY']
@@ -15,9 +48,20 @@ class FoursquareService:
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
+        self.session = _get_session()
         self.file_manager = FileManager()
         self.data_processor = DataProcessor()
     
+    def run_concurrently(self, *calls: Callable[[], Dict]) -> List[Dict]:
+        """Run independent API calls in parallel and return their results in order"""
+        app = current_app._get_current_object()
+        
+        def run(call):
+            with app.app_context():
+                return call()
+        
+        return list(_executor.map(run, calls))
+    
     def search_places(self, query: str, location: str, radius: int = 1000, 
                      categories: List[str] = None, limit: int = 50) -> Dict:
         """Search for places using Foursquare Places API"""
@@ -40,17 +84,17 @@ class FoursquareService:
             params['categories'] = ','.join(categories)
         
         try:
-            response = requests.get(url, headers=self.headers, params=params, 
-                                  timeout=current_app.config['REQUEST_TIMEOUT'])
+            response = self.session.get(url, headers=self.headers, params=params,
+                                        timeout=current_app.config['REQUEST_TIMEOUT'])
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Cache the result
             self.file_manager.cache_data(cache_key, data)
             
             return data
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             current_app.logger.error(f"Foursquare API error: {str(e)}")
             return {'results': [], 'error': str(e)}
     
@@ -65,17 +109,16 @@ class FoursquareService:
         url = f"{self.base_url}/places/{place_id}"
         
         try:
-            response = requests.get(url, headers=self.headers, 
-                                  timeout=current_app.config['REQUEST_TIMEOUT'])
+            response = self.session.get(url, headers=self.headers, timeout=current_app.config['REQUEST_TIMEOUT'])
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Cache the result
             self.file_manager.cache_data(cache_key, data)
             
             return data
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             current_app.logger.error(f"Foursquare API error: {str(e)}")
             return {'error': str(e)}
     
@@ -90,32 +133,32 @@ class FoursquareService:
         url = f"{self.base_url}/places/{place_id}/tips"
         
         try:
-            response = requests.get(url, headers=self.headers, 
-                                  timeout=current_app.config['REQUEST_TIMEOUT'])
+            response = self.session.get(url, headers=self.headers, timeout=current_app.config['REQUEST_TIMEOUT'])
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Cache the result
             self.file_manager.cache_data(cache_key, data)
             
             return data
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             current_app.logger.error(f"Foursquare API error: {str(e)}")
             return {'tips': [], 'error': str(e)}
     
     def search_nearby_categories(self, lat: float, lng: float, 
                                 radius: int = 1000) -> Dict:
         """Search for various business categories in a location"""
-        categories = [
-            '13065',  # Food & Beverage
-            '17069',  # Retail
-            '10032',  # Entertainment
-            '12022',  # Professional Services
-            '19014'   # Transportation
-        ]
-        
-        cache_key = f"nearby_categories_{lat}_{lng}_{radius}"
+        return self._search_nearby(lat, lng, radius, NEARBY_CATEGORIES, 'nearby_categories')
+    
+    def search_area_bundle(self, lat: float, lng: float, radius: int = 1000) -> Dict:
+        """One nearby search covering every category the area analysis partitions on"""
+        return self._search_nearby(lat, lng, radius, AREA_BUNDLE_CATEGORIES, 'area_bundle')
+    
+    def _search_nearby(self, lat: float, lng: float, radius: int,
+                       categories: List[str], cache_prefix: str) -> Dict:
+        """Query /places/nearby for the given category IDs, with caching"""
+        cache_key = f"{cache_prefix}_{lat}_{lng}_{radius}"
         cached_result = self.file_manager.get_cached_data(cache_key)
         if cached_result:
             return cached_result
@@ -129,16 +172,18 @@ class FoursquareService:
         }
         
         try:
-            response = requests.get(url, headers=self.headers, params=params,
-                                  timeout=current_app.config['REQUEST_TIMEOUT'])
+            response = self.session.get(url, headers=self.headers, params=params,
+                                        timeout=current_app.config['REQUEST_TIMEOUT'])
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Cache the result
             self.file_manager.cache_data(cache_key, data)
             
             return data
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             current_app.logger.error(f"Foursquare API error: {str(e)}")
-            return {'results': [], 'error': str(e)}
\ No newline at end of file
+            # Keep the HTTP status so callers can tell a rejected query from an outage
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            return {'results': [], 'error': str(e), 'status': status}
\ No newline at end of file
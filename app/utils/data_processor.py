@@ -1,141 +1,221 @@
 # app/utils/data_processor.py
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Tuple, Optional
-from geopy.distance import geodesic
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Union
+import math
 import re
 from collections import Counter
+from app.models.business import BUSINESS_TYPE_SPEC, get_business_spec
+
+EARTH_RADIUS_M = 6371000.0
+
+# "lat, lng" pair, e.g. "40.7128, -74.0060"
+_COORD_RE = re.compile(r'(-?\d+(?:\.\d+)?),\s*(-?\d+(?:\.\d+)?)')
+
+def _haversine_m(lat1, lng1, lat2, lng2):
+    """Great-circle distance in meters; accepts scalars or NumPy arrays"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+
+def _geo(business: Dict) -> Tuple[float, float]:
+    """(lat, lng) of a venue, or (0, 0) when Foursquare omitted the geocode"""
+    try:
+        main = business['geocodes']['main']
+    except (KeyError, TypeError):
+        return 0.0, 0.0
+    return main.get('latitude') or 0.0, main.get('longitude') or 0.0
+
+@dataclass(slots=True)
+class VenueArrays:
+    """Column-oriented view of a Foursquare venue list, extracted once per analysis"""
+    records: List[Dict]
+    lat: np.ndarray
+    lng: np.ndarray
+    rating: np.ndarray
+    popularity: np.ndarray
+    price: np.ndarray
+    names: List[str]
+    categories: List[List[str]]
+    
+    def __len__(self) -> int:
+        return len(self.records)
 
 class DataProcessor:
     def __init__(self):
         self.business_categories = {
-            'food_truck': ['food', 'restaurant', 'cafe', 'truck'],
-            'retail': ['shop', 'store', 'boutique', 'market'],
-            'service': ['salon', 'repair', 'cleaning', 'consultation'],
-            'entertainment': ['music', 'art', 'performance', 'event']
+            business_type: list(spec.keywords)
+            for business_type, spec in BUSINESS_TYPE_SPEC.items()
+        }
+        
+        # One compiled alternation per keyword set instead of a Python loop per keyword
+        self._competitor_patterns = {
+            business_type: self._compile_keywords(keywords)
+            for business_type, keywords in self.business_categories.items()
         }
+        self._family_pattern = self._compile_keywords(['park', 'playground', 'school', 'family', 'kids'])
+        self._professional_pattern = self._compile_keywords(['office', 'coworking', 'coffee', 'gym', 'bar'])
+        self._tourist_pattern = self._compile_keywords(['museum', 'tourist', 'hotel', 'attraction', 'landmark'])
+        self._attraction_pattern = self._compile_keywords(['attraction', 'landmark', 'museum', 'park', 'gallery',
+                                                           'monument', 'theater', 'restaurant'])
+    
+    @staticmethod
+    def _compile_keywords(keywords: List[str]) -> re.Pattern:
+        """Compile keywords into a single substring-matching regex"""
+        return re.compile('|'.join(map(re.escape, keywords)))
+    
+    def materialize(self, businesses: List[Dict]) -> VenueArrays:
+        """Walk the venue dicts once and pull every field the analyzers need into arrays"""
+        count = len(businesses)
+        lat = np.zeros(count)
+        lng = np.zeros(count)
+        rating = np.zeros(count)
+        popularity = np.zeros(count)
+        price = np.full(count, np.nan)
+        names = []
+        categories = []
+        
+        for i, business in enumerate(businesses):
+            lat[i], lng[i] = _geo(business)
+            rating[i] = business.get('rating') or 0
+            popularity[i] = business.get('popularity') or 0
+            if business.get('price'):
+                price[i] = business['price']
+            names.append(business.get('name', ''))
+            categories.append([cat.get('name', '') for cat in business.get('categories', [])])
+        
+        return VenueArrays(businesses, lat, lng, rating, popularity, price, names, categories)
+    
+    def _as_venues(self, businesses: Union[List[Dict], VenueArrays]) -> VenueArrays:
+        return businesses if isinstance(businesses, VenueArrays) else self.materialize(businesses)
     
     def calculate_distance(self, loc1: Tuple[float, float], 
                           loc2: Tuple[float, float]) -> float:
-        """Calculate distance between two coordinates in meters"""
-        return geodesic(loc1, loc2).meters
+        """Calculate distance between two coordinates in meters (haversine)"""
+        lat1, lng1 = math.radians(loc1[0]), math.radians(loc1[1])
+        lat2, lng2 = math.radians(loc2[0]), math.radians(loc2[1])
+        a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+    
+    def _distances_to(self, target_location: Tuple[float, float],
+                      venues: VenueArrays) -> np.ndarray:
+        """Haversine distance in meters from target to every venue, in one vector pass"""
+        return _haversine_m(target_location[0], target_location[1], venues.lat, venues.lng)
     
     def analyze_competition_density(self, target_location: Tuple[float, float],
-                                  businesses: List[Dict], 
+                                  businesses: Union[List[Dict], VenueArrays], 
                                   business_type: str) -> Dict:
         """Analyze competition density around a target location"""
-        relevant_businesses = []
-        
-        for business in businesses:
-            if self._is_competitor(business, business_type):
-                business_location = (
-                    business.get('geocodes', {}).get('main', {}).get('latitude', 0),
-                    business.get('geocodes', {}).get('main', {}).get('longitude', 0)
-                )
-                distance = self.calculate_distance(target_location, business_location)
-                
-                if distance <= 500:  # Within 500m radius
-                    relevant_businesses.append({
-                        'business': business,
-                        'distance': distance
-                    })
+        venues = self._as_venues(businesses)
+        is_competitor = np.fromiter(
+            (self._matches_competitor(name, categories, business_type)
+             for name, categories in zip(venues.names, venues.categories)),
+            bool, len(venues)
+        )
+        distances = self._distances_to(target_location, venues)
+        
+        # Competitors within 500m radius, closest first
+        close = is_competitor & (distances <= 500)
+        close_idx = np.flatnonzero(close)
+        close_idx = close_idx[np.argsort(distances[close_idx], kind='stable')]
         
         # Calculate density metrics
-        total_competitors = len(relevant_businesses)
-        avg_rating = np.mean([b['business'].get('rating', 0) for b in relevant_businesses if b['business'].get('rating')])
+        total_competitors = int(close_idx.size)
+        rated = venues.rating[close_idx]
+        rated = rated[rated > 0]
+        avg_rating = float(rated.mean()) if rated.size else 0
         
         # Competition density score (lower is better for new business)
         density_score = max(0, 100 - (total_competitors * 10))
         
         return {
             'total_competitors': total_competitors,
-            'average_competitor_rating': avg_rating if not np.isnan(avg_rating) else 0,
+            'average_competitor_rating': avg_rating,
             'density_score': density_score,
-            'nearby_competitors': relevant_businesses[:5]  # Top 5 closest
+            'nearby_competitors': [
+                {'business': venues.records[i], 'distance': float(distances[i])}
+                for i in close_idx[:5]
+            ]  # Top 5 closest
         }
     
     def _is_competitor(self, business: Dict, business_type: str) -> bool:
         """Check if a business is a competitor for the given business type"""
-        categories = [cat.get('name', '').lower() for cat in business.get('categories', [])]
-        name = business.get('name', '').lower()
-        
-        keywords = self.business_categories.get(business_type, [])
-        
-        for keyword in keywords:
-            if any(keyword in category for category in categories) or keyword in name:
-                return True
-        
-        return False
+        categories = [cat.get('name', '') for cat in business.get('categories', [])]
+        return self._matches_competitor(business.get('name', ''), categories, business_type)
+    
+    def _matches_competitor(self, name: str, categories: List[str], business_type: str) -> bool:
+        """Check a venue's name and category names against the competitor keywords"""
+        pattern = self._competitor_patterns.get(business_type)
+        if pattern is None:
+            return False
+        
+        # One lowercase + one regex scan over name and categories; '\0' keeps matches from spanning fields
+        blob = '\0'.join([name, *categories]).lower()
+        return pattern.search(blob) is not None
     
-    def calculate_foot_traffic_score(self, businesses: List[Dict], 
+    def _is_attraction(self, business: Dict) -> bool:
+        """Check if a business is a draw for visitors (landmark, museum, restaurant, ...)"""
+        names = [business.get('name', '')] + [cat.get('name', '') for cat in business.get('categories', [])]
+        return self._attraction_pattern.search('\0'.join(names).lower()) is not None
+    
+    def calculate_foot_traffic_score(self, businesses: Union[List[Dict], VenueArrays], 
                                    target_location: Tuple[float, float]) -> float:
         """Calculate foot traffic score based on nearby popular venues"""
-        traffic_score = 0
-        
-        for business in businesses:
-            business_location = (
-                business.get('geocodes', {}).get('main', {}).get('latitude', 0),
-                business.get('geocodes', {}).get('main', {}).get('longitude', 0)
-            )
-            distance = self.calculate_distance(target_location, business_location)
-            
-            if distance <= 200:  # Very close
-                popularity = business.get('popularity', 0)
-                traffic_score += popularity * 1.5
-            elif distance <= 500:  # Close
-                popularity = business.get('popularity', 0)
-                traffic_score += popularity * 1.0
-            elif distance <= 1000:  # Nearby
-                popularity = business.get('popularity', 0)
-                traffic_score += popularity * 0.5
+        venues = self._as_venues(businesses)
+        if not len(venues):
+            return 0
+        
+        distances = self._distances_to(target_location, venues)
+        
+        # Very close (<=200m), close (<=500m) and nearby (<=1km) venues contribute
+        weights = np.select([distances <= 200, distances <= 500, distances <= 1000], [1.5, 1.0, 0.5], default=0.0)
+        traffic_score = float(weights @ venues.popularity)
         
         # Normalize score to 0-100
         return min(100, traffic_score / 10)
     
-    def identify_category_gaps(self, businesses: List[Dict], 
+    def identify_category_gaps(self, businesses: Union[List[Dict], VenueArrays], 
                               target_business_type: str) -> List[str]:
         """Identify underserved business categories in the area"""
-        present_categories = set()
-        
-        for business in businesses:
-            categories = [cat.get('name', '') for cat in business.get('categories', [])]
-            present_categories.update(categories)
-        
-        # Define essential categories for different areas
-        essential_categories = {
-            'food_truck': ['Coffee Shop', 'Fast Food', 'Grocery Store', 'Bakery'],
-            'retail': ['Clothing Store', 'Electronics Store', 'Bookstore', 'Pharmacy'],
-            'service': ['Hair Salon', 'Laundry', 'Bank', 'Post Office'],
-            'entertainment': ['Cinema', 'Bar', 'Gym', 'Park']
-        }
+        venues = self._as_venues(businesses)
+        
+        # Lowercase each distinct category name once, not once per essential
+        present_categories = {category.lower() for categories in venues.categories for category in categories}
         
         gaps = []
-        target_essentials = essential_categories.get(target_business_type, [])
+        target_essentials = get_business_spec(target_business_type).essentials
         
         for category in target_essentials:
-            if not any(category.lower() in present_cat.lower() for present_cat in present_categories):
-                gaps.append(category)
+            needle = category.lower()
+            # Exact hit is a set lookup; otherwise fall back to the substring scan
+            if needle in present_categories or any(needle in present_cat for present_cat in present_categories):
+                continue
+            gaps.append(category)
         
         return gaps
     
-    def analyze_demographic_patterns(self, businesses: List[Dict]) -> Dict:
+    def analyze_demographic_patterns(self, businesses: Union[List[Dict], VenueArrays]) -> Dict:
         """Analyze demographic patterns from business types"""
+        venues = self._as_venues(businesses)
         category_counts = Counter()
-        price_levels = []
         
-        for business in businesses:
-            categories = [cat.get('name', '') for cat in business.get('categories', [])]
+        for categories in venues.categories:
             category_counts.update(categories)
-            
-            if business.get('price'):
-                price_levels.append(business['price'])
+        
+        # Lowercase each distinct category once for the three keyword counts
+        lowered_counts = Counter()
+        for category, freq in category_counts.items():
+            lowered_counts[category.lower()] += freq
+        
+        price_levels = venues.price[~np.isnan(venues.price)]
         
         # Infer demographics
         demographics = {
-            'affluence_indicator': np.mean(price_levels) if price_levels else 2,
-            'family_friendly': self._count_family_venues(category_counts),
-            'young_professional': self._count_professional_venues(category_counts),
-            'tourist_area': self._count_tourist_venues(category_counts),
+            'affluence_indicator': price_levels.mean() if price_levels.size else 2,
+            'family_friendly': self._count_family_venues(lowered_counts),
+            'young_professional': self._count_professional_venues(lowered_counts),
+            'tourist_area': self._count_tourist_venues(lowered_counts),
             'dominant_categories': category_counts.most_common(5)
         }
         
@@ -143,36 +223,24 @@ class DataProcessor:
     
     def _count_family_venues(self, category_counts: Counter) -> int:
         """Count family-friendly venue indicators"""
-        family_keywords = ['park', 'playground', 'school', 'family', 'kids']
-        count = 0
-        for category, freq in category_counts.items():
-            if any(keyword in category.lower() for keyword in family_keywords):
-                count += freq
-        return count
+        return self._count_matching_venues(category_counts, self._family_pattern)
     
     def _count_professional_venues(self, category_counts: Counter) -> int:
         """Count young professional venue indicators"""
-        professional_keywords = ['office', 'coworking', 'coffee', 'gym', 'bar']
-        count = 0
-        for category, freq in category_counts.items():
-            if any(keyword in category.lower() for keyword in professional_keywords):
-                count += freq
-        return count
+        return self._count_matching_venues(category_counts, self._professional_pattern)
     
     def _count_tourist_venues(self, category_counts: Counter) -> int:
         """Count tourist venue indicators"""
-        tourist_keywords = ['museum', 'tourist', 'hotel', 'attraction', 'landmark']
-        count = 0
-        for category, freq in category_counts.items():
-            if any(keyword in category.lower() for keyword in tourist_keywords):
-                count += freq
-        return count
+        return self._count_matching_venues(category_counts, self._tourist_pattern)
+    
+    def _count_matching_venues(self, category_counts: Counter, pattern: re.Pattern) -> int:
+        """Sum the frequency of (lowercased) categories matching any keyword in pattern"""
+        return sum(freq for category, freq in category_counts.items() if pattern.search(category))
     
     def extract_location_coordinates(self, location_string: str) -> Optional[Tuple[float, float]]:
         """Extract lat, lng from location string or address"""
         # Simple regex to extract coordinates if provided
-        coord_pattern = r'(-?\d+\.?\d*),\s*(-?\d+\.?\d*)'
-        match = re.search(coord_pattern, location_string)
+        match = _COORD_RE.search(location_string)
         
         if match:
             lat, lng = float(match.group(1)), float(match.group(2))
@@ -1,23 +1,349 @@
 # app/utils/file_manager.py
-import json
+import orjson
 import os
 import time
+import atexit
+import logging
 import hashlib
-from typing import Any, Optional, Dict
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Iterator, Optional, Dict, List, Tuple
 from flask import current_app
 from datetime import datetime, timedelta
 
+def _dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+_loads = orjson.loads
+
+def _write_atomic(path: str, payload: bytes):
+    """Write payload to path via a temp file so readers never see a partial file"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# In-process LRU over the file cache, shared by every FileManager in the process
+_MEMORY_CACHE_SIZE = 4096
+_memory_cache: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+# Writes deferred to the background flusher: analytics lines as (file_path, line),
+# and dirty cache entries as cache_path -> payload (repeat writes coalesce)
+_FLUSH_DELAY = 0.1  # seconds
+_ANALYTICS_BATCH_SIZE = 256
+_CACHE_BATCH_SIZE = 32
+_ANALYTICS_QUEUE_LIMIT = 65536  # lines held while the disk is stalled; beyond this, events are dropped
+_analytics_queue: 'deque[Tuple[str, bytes]]' = deque()
+_dirty_cache: Dict[str, bytes] = {}
+_pending = threading.Condition()
+_analytics_write_lock = threading.Lock()
+_cache_write_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+_analytics_dropped = 0
+
+# Runs outside any app context; propagates to the Flask app logger
+logger = logging.getLogger(__name__)
+
+try:
+    _IOV_MAX = os.sysconf('SC_IOV_MAX')
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+
+def _append_lines(file_path: str, lines: List[bytes]):
+    """Append lines to file_path, gathering up to IOV_MAX of them per syscall"""
+    fd = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+    try:
+        for start in range(0, len(lines), _IOV_MAX):
+            chunk = lines[start:start + _IOV_MAX]
+            written = os.writev(fd, chunk) if hasattr(os, 'writev') else 0
+            
+            # Short (or no) gathered write: finish with plain writes
+            if written < sum(map(len, chunk)):
+                rest = b''.join(chunk)[written:]
+                while rest:
+                    rest = rest[os.write(fd, rest):]
+    finally:
+        os.close(fd)
+
+def _analytics_dropped_event() -> int:
+    """Count one event dropped on a full queue; caller holds _pending"""
+    global _analytics_dropped
+    _analytics_dropped += 1
+    return _analytics_dropped
+
+def _flush_analytics():
+    """Write every queued analytics line, one append per daily file"""
+    with _analytics_write_lock:
+        with _pending:
+            batch = list(_analytics_queue)
+            _analytics_queue.clear()
+        
+        if not batch:
+            return
+        
+        lines_by_path: Dict[str, List[bytes]] = {}
+        for file_path, line in batch:
+            lines_by_path.setdefault(file_path, []).append(line)
+        
+        for file_path, lines in lines_by_path.items():
+            try:
+                _append_lines(file_path, lines)
+            except OSError as e:
+                logger.error(f"Failed to flush analytics: {str(e)}")
+
+def _flush_cache():
+    """Write every dirty cache entry to disk"""
+    with _cache_write_lock:
+        with _pending:
+            batch = list(_dirty_cache.items())
+        
+        for cache_path, payload in batch:
+            try:
+                _write_atomic(cache_path, payload)
+            except OSError as e:
+                logger.error(f"Failed to flush cache entry: {str(e)}")
+            
+            # Keep the entry readable until it is on disk, unless it was rewritten meanwhile
+            with _pending:
+                if _dirty_cache.get(cache_path) is payload:
+                    del _dirty_cache[cache_path]
+
+def _flush_all():
+    """Write out everything the flusher is holding"""
+    _flush_analytics()
+    _flush_cache()
+
+def _flush_due() -> bool:
+    return len(_analytics_queue) >= _ANALYTICS_BATCH_SIZE or len(_dirty_cache) >= _CACHE_BATCH_SIZE
+
+def _flush_loop():
+    """Flush once a batch fills up or the oldest pending write has waited long enough"""
+    while True:
+        with _pending:
+            _pending.wait_for(lambda: _analytics_queue or _dirty_cache)
+            _pending.wait_for(_flush_due, timeout=_FLUSH_DELAY)
+        _flush_all()
+
+def _ensure_flusher():
+    """Start the background flusher on first use"""
+    global _flusher
+    with _pending:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='file-manager-flusher', daemon=True)
+            _flusher.start()
+
+atexit.register(_flush_all)
+
+def _reset_flusher_after_fork():
+    """A forked child has no flusher thread and may inherit held locks; start clean"""
+    global _flusher, _pending, _analytics_write_lock, _cache_write_lock, _memory_cache_lock, _analytics_dropped
+    _flusher = None
+    _pending = threading.Condition()
+    _analytics_write_lock = threading.Lock()
+    _cache_write_lock = threading.Lock()
+    _memory_cache_lock = threading.Lock()
+    _analytics_dropped = 0
+    # The parent still owns (and flushes) whatever it had queued
+    _analytics_queue.clear()
+    _dirty_cache.clear()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_flusher_after_fork)
+
+class _AnalysisLog:
+    """Append-only log of user analyses with an id -> (offset, length) index"""
+    INDEX_SAVE_EVERY = 64
+    
+    def __init__(self, directory: str):
+        self.log_path = os.path.join(directory, 'analyses.jsonl')
+        self.index_path = os.path.join(directory, 'analyses.idx')
+        self.lock = threading.Lock()
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.indexed_end = 0  # log offset up to which self.index is complete
+        self.unsaved = 0
+        self.fd: Optional[int] = None
+        self.fd_pid: Optional[int] = None
+        self._load_index()
+    
+    def _file(self) -> int:
+        """Log descriptor, reopened after a fork so processes never share an offset"""
+        if self.fd is None or self.fd_pid != os.getpid():
+            self.fd = os.open(self.log_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+            self.fd_pid = os.getpid()
+        return self.fd
+    
+    def close(self):
+        """Close this process's log descriptor; the next access reopens it"""
+        with self.lock:
+            if self.fd is not None and self.fd_pid == os.getpid():
+                os.close(self.fd)
+            self.fd = None
+    
+    def _load_index(self):
+        """Load the persisted index, then index whatever was appended after it"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                saved = _loads(f.read())
+            self.index = {key: tuple(entry) for key, entry in saved['index'].items()}
+            self.indexed_end = saved['end']
+            if self.indexed_end > os.path.getsize(self.log_path):
+                raise ValueError('index is ahead of the log')
+        except (OSError, ValueError, KeyError, TypeError):
+            self.index, self.indexed_end = {}, 0
+        
+        self._catch_up()
+    
+    def _catch_up(self):
+        """Index records appended past indexed_end by another process or before a crash"""
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self.indexed_end)
+                offset = self.indexed_end
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # torn final write; the next append terminates it
+                    try:
+                        self.index[_loads(line)['analysis_id']] = (offset, len(line))
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                    offset += len(line)
+                self.indexed_end = offset
+        except FileNotFoundError:
+            pass
+    
+    def save_index(self):
+        """Persist the index next to the log"""
+        with self.lock:
+            if self.unsaved:
+                _write_atomic(self.index_path, _dumps({'end': self.indexed_end, 'index': self.index}))
+                self.unsaved = 0
+    
+    def append(self, analysis_id: str, record: bytes):
+        """Append one record and index it"""
+        line = record + b'\n'
+        with self.lock:
+            fd = self._file()
+            
+            # Terminate a torn tail left by a crashed writer so this record starts
+            # on its own line instead of being glued onto the fragment
+            size = os.fstat(fd).st_size
+            torn = size and os.pread(fd, 1, size - 1) != b'\n'
+            rest = b'\n' + line if torn else line
+            while rest:
+                rest = rest[os.write(fd, rest):]
+            
+            # O_APPEND leaves the offset at the end of this write
+            end = os.lseek(fd, 0, os.SEEK_CUR)
+            offset = end - len(line)
+            self.index[analysis_id] = (offset, len(line))
+            if offset == self.indexed_end:
+                self.indexed_end = end
+            
+            self.unsaved += 1
+            save_due = self.unsaved >= self.INDEX_SAVE_EVERY
+        
+        if save_due:
+            self.save_index()
+    
+    def get(self, analysis_id: str) -> Optional[Dict]:
+        """Read one record with a single pread, or None if it was never logged"""
+        with self.lock:
+            entry = self.index.get(analysis_id)
+            # Another process may have appended (or re-saved this id) since the last scan
+            if entry is None or os.fstat(self._file()).st_size > self.indexed_end:
+                self._catch_up()
+                entry = self.index.get(analysis_id)
+            if entry is None:
+                return None
+            
+            offset, length = entry
+            line = os.pread(self._file(), length, offset)
+        
+        return _loads(line)
+
+_analysis_logs: Dict[str, _AnalysisLog] = {}
+_analysis_logs_lock = threading.Lock()
+
+def _analysis_log(directory: str) -> _AnalysisLog:
+    """The process-wide analysis log for a user data directory"""
+    with _analysis_logs_lock:
+        log = _analysis_logs.get(directory)
+        if log is None:
+            log = _analysis_logs[directory] = _AnalysisLog(directory)
+        return log
+
+def _save_analysis_indexes():
+    """Persist every open analysis index"""
+    for log in list(_analysis_logs.values()):
+        try:
+            log.save_index()
+        except OSError as e:
+            logger.error(f"Failed to save analysis index: {str(e)}")
+
+atexit.register(_save_analysis_indexes)
+
 class FileManager:
+    # All state lives on the class (settings) or at module level (caches, queues),
+    # so instances need no __dict__
+    __slots__ = ()
+    
+    # Storage settings, bound once per app by Config.init_app
+    cache_dir: Optional[str] = None
+    user_data_dir: Optional[str] = None
+    analytics_dir: Optional[str] = None
+    # The directories with a trailing separator, for building file paths by concatenation
+    _cache_prefix = _user_data_prefix = _analytics_prefix = ''
+    cache_expiry: int = 0
+    
+    @classmethod
+    def configure(cls, app):
+        """Bind storage settings from the app config"""
+        cls.cache_dir = app.config['CACHE_DIR']
+        cls.user_data_dir = app.config['USER_DATA_DIR']
+        cls.analytics_dir = app.config['ANALYTICS_DIR']
+        cls._cache_prefix = os.path.join(cls.cache_dir, '')
+        cls._user_data_prefix = os.path.join(cls.user_data_dir, '')
+        cls._analytics_prefix = os.path.join(cls.analytics_dir, '')
+        cls.cache_expiry = app.config['CACHE_EXPIRY']
+    
     def __init__(self):
-        self.cache_dir = current_app.config['CACHE_DIR']
-        self.user_data_dir = current_app.config['USER_DATA_DIR']
-        self.analytics_dir = current_app.config['ANALYTICS_DIR']
-        self.cache_expiry = current_app.config['CACHE_EXPIRY']
+        if FileManager.cache_dir is None:
+            # App was built without Config.init_app
+            FileManager.configure(current_app)
     
     def _get_cache_path(self, key: str) -> str:
         """Generate cache file path from key"""
-        hashed_key = hashlib.md5(key.encode()).hexdigest()
-        return os.path.join(self.cache_dir, f"{hashed_key}.json")
+        hashed_key = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return f"{self._cache_prefix}{hashed_key}.json"
+    
+    def _remember(self, key: str, timestamp: float, data: Any):
+        """Store a cache entry in the in-process layer, evicting the oldest"""
+        with _memory_cache_lock:
+            _memory_cache[key] = (timestamp, data)
+            _memory_cache.move_to_end(key)
+            while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+                _memory_cache.popitem(last=False)
+    
+    def _recall(self, key: str) -> Optional[Any]:
+        """Return a fresh entry from the in-process layer, if any"""
+        with _memory_cache_lock:
+            entry = _memory_cache.get(key)
+            if entry is None:
+                return None
+            
+            timestamp, data = entry
+            if time.time() - timestamp > self.cache_expiry:
+                del _memory_cache[key]
+                return None
+            
+            _memory_cache.move_to_end(key)
+            return data
     
     def cache_data(self, key: str, data: Any) -> bool:
         """Cache data to file system"""
@@ -25,12 +351,18 @@ class FileManager:
             cache_path = self._get_cache_path(key)
             cache_data = {
                 'data': data,
-                'timestamp': time.time(),
                 'key': key
             }
             
-            with open(cache_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            # The file mtime is the cache timestamp
+            payload = _dumps(cache_data)
+            self._remember(key, time.time(), data)
+            
+            # Write-back: the flusher persists the latest payload per key in batches
+            _ensure_flusher()
+            with _pending:
+                _dirty_cache[cache_path] = payload
+                _pending.notify()
             
             return True
         except Exception as e:
@@ -39,20 +371,33 @@ class FileManager:
     
     def get_cached_data(self, key: str) -> Optional[Any]:
         """Retrieve cached data if not expired"""
+        data = self._recall(key)
+        if data is not None:
+            return data
+        
         try:
             cache_path = self._get_cache_path(key)
             
-            if not os.path.exists(cache_path):
-                return None
+            # Written but not yet flushed (and already evicted from memory)
+            with _pending:
+                payload = _dirty_cache.get(cache_path)
+            if payload is not None:
+                return _loads(payload)['data']
             
-            with open(cache_path, 'r') as f:
-                cache_data = json.load(f)
+            try:
+                mtime = os.stat(cache_path).st_mtime
+            except FileNotFoundError:
+                return None
             
-            # Check if cache is expired
-            if time.time() - cache_data['timestamp'] > self.cache_expiry:
+            # Check expiry before paying for the parse
+            if time.time() - mtime > self.cache_expiry:
                 os.remove(cache_path)
                 return None
             
+            with open(cache_path, 'rb') as f:
+                cache_data = _loads(f.read())
+            
+            self._remember(key, mtime, cache_data['data'])
             return cache_data['data']
         except Exception as e:
             current_app.logger.error(f"Failed to retrieve cached data: {str(e)}")
@@ -61,16 +406,15 @@ class FileManager:
     def save_user_analysis(self, analysis_id: str, data: Dict) -> bool:
         """Save user analysis to file system"""
         try:
-            file_path = os.path.join(self.user_data_dir, f"{analysis_id}.json")
+            now = datetime.now().isoformat()
             analysis_data = {
                 'analysis_id': analysis_id,
                 'data': data,
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
+                'created_at': now,
+                'updated_at': now
             }
             
-            with open(file_path, 'w') as f:
-                json.dump(analysis_data, f, indent=2)
+            _analysis_log(self.user_data_dir).append(analysis_id, _dumps(analysis_data))
             
             return True
         except Exception as e:
@@ -80,13 +424,18 @@ class FileManager:
     def get_user_analysis(self, analysis_id: str) -> Optional[Dict]:
         """Retrieve user analysis"""
         try:
-            file_path = os.path.join(self.user_data_dir, f"{analysis_id}.json")
+            analysis = _analysis_log(self.user_data_dir).get(analysis_id)
+            if analysis is not None:
+                return analysis
+            
+            # Analyses saved before the aggregated log live in one file each
+            file_path = f"{self._user_data_prefix}{analysis_id}.json"
             
             if not os.path.exists(file_path):
                 return None
             
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                return _loads(f.read())
         except Exception as e:
             current_app.logger.error(f"Failed to retrieve analysis: {str(e)}")
             return None
@@ -94,28 +443,56 @@ class FileManager:
     def save_analytics_data(self, event_type: str, data: Dict) -> bool:
         """Save analytics events"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            file_path = os.path.join(self.analytics_dir, f"analytics_{today}.json")
+            now = datetime.now()
+            file_path = f"{self._analytics_prefix}analytics_{now:%Y-%m-%d}.jsonl"
             
             event_data = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now.isoformat(),
                 'event_type': event_type,
                 'data': data
             }
             
-            # Append to daily analytics file
-            if os.path.exists(file_path):
-                with open(file_path, 'r') as f:
-                    analytics_data = json.load(f)
-            else:
-                analytics_data = {'events': []}
-            
-            analytics_data['events'].append(event_data)
+            # Queue one line for the daily analytics log; the flusher appends in batches
+            line = _dumps(event_data) + b'\n'
+            _ensure_flusher()
+            with _pending:
+                if len(_analytics_queue) >= _ANALYTICS_QUEUE_LIMIT:
+                    dropped = _analytics_dropped_event()
+                else:
+                    _analytics_queue.append((file_path, line))
+                    dropped = 0
+                _pending.notify()
             
-            with open(file_path, 'w') as f:
-                json.dump(analytics_data, f, indent=2)
+            if dropped:
+                # Log the first drop and then every thousandth, not every event
+                if dropped == 1 or dropped % 1000 == 0:
+                    current_app.logger.error(f"Analytics queue full; dropped {dropped} events so far")
+                return False
             
             return True
         except Exception as e:
             current_app.logger.error(f"Failed to save analytics: {str(e)}")
             return False
+    
+    def iter_analytics(self, day: Optional[str] = None) -> Iterator[Dict]:
+        """Stream the events logged on a day (YYYY-MM-DD, default today) one at a time"""
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        file_path = f"{self._analytics_prefix}analytics_{day}.jsonl"
+        
+        # Days logged before the JSONL switch hold one {'events': [...]} document
+        try:
+            with open(f"{self._analytics_prefix}analytics_{day}.json", 'rb') as f:
+                yield from _loads(f.read()).get('events', [])
+        except FileNotFoundError:
+            pass
+        
+        # Make events still waiting in the batch queue visible
+        _flush_analytics()
+        
+        try:
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n'):  # skip a torn final write
+                        yield _loads(line)
+        except FileNotFoundError:
+            return
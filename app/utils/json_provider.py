@@ -0,0 +1,25 @@
+# app/utils/json_provider.py
+import numpy as np
+import orjson
+from typing import Any, Union
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not serialize natively"""
+    # orjson only takes C-contiguous arrays of native dtypes
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    # Decimal, __html__ and anything else Flask's default provider handled
+    return DefaultJSONProvider.default(obj)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that serializes with orjson"""
+    
+    # numpy scalars/arrays come back from the ML and data processing code
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=self.option).decode()
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
\ No newline at end of file
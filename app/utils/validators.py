@@ -1,6 +1,13 @@
 # app/utils/validators.py
-import re
+import numpy as np
 from typing import Dict, List, Optional, Tuple
+from app.models.business import BUSINESS_TYPE_SPEC
+
+# Characters stripped from user input by sanitize_input
+_SANITIZE_TABLE = str.maketrans('', '', '<>"\'')
+
+# Business types the analysis pipeline has a spec for
+_VALID_BUSINESS_TYPES = frozenset(BUSINESS_TYPE_SPEC)
 
 class Validators:
     @staticmethod
@@ -8,17 +15,29 @@ class Validators:
         """Validate latitude and longitude"""
         return -90 <= lat <= 90 and -180 <= lng <= 180
     
+    @staticmethod
+    def validate_coordinates_batch(lats, lngs) -> np.ndarray:
+        """Validate many latitude/longitude pairs at once, one bool per pair"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        return (lats >= -90) & (lats <= 90) & (lngs >= -180) & (lngs <= 180)
+    
     @staticmethod
     def validate_business_type(business_type: str) -> bool:
         """Validate business type"""
-        valid_types = ['food_truck', 'retail', 'service', 'entertainment']
-        return business_type.lower() in valid_types
+        return business_type.lower() in _VALID_BUSINESS_TYPES
     
     @staticmethod
     def validate_radius(radius: int) -> bool:
         """Validate search radius"""
         return 100 <= radius <= 10000  # 100m to 10km
     
+    @staticmethod
+    def validate_radius_batch(radii) -> np.ndarray:
+        """Validate many search radii at once, one bool per radius"""
+        radii = np.asarray(radii)
+        return (radii >= 100) & (radii <= 10000)
+    
     @staticmethod
     def sanitize_input(input_string: str) -> str:
         """Sanitize user input"""
@@ -26,21 +45,13 @@ class Validators:
             return ""
         
         # Remove potentially harmful characters
-        sanitized = re.sub(r'[<>"\']', '', input_string)
-        return sanitized.strip()
+        return input_string.translate(_SANITIZE_TABLE).strip()
     
     @staticmethod
     def validate_api_response(response_data: Dict) -> bool:
         """Validate Foursquare API response structure"""
-        if not isinstance(response_data, dict):
-            return False
-        
-        # Check for error in response
-        if 'error' in response_data:
-            return False
-        
-        # Check for results
-        if 'results' in response_data:
-            return isinstance(response_data['results'], list)
-        
-        return True
\ No newline at end of file
+        # A dict without an error, whose results (if present) are a list
+        return (isinstance(response_data, dict)
+                and 'error' not in response_data
+                and ('results' not in response_data
+                     or isinstance(response_data['results'], list)))
\ No newline at end of file
@@ -1,5 +1,6 @@
 import os
 from datetime import timedelta
+from pathlib import Path
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -15,6 +16,8 @@ class Config:
     USER_DATA_DIR = os.path.join(DATA_DIR, 'user_data')
     ML_MODELS_DIR = os.path.join(DATA_DIR, 'ml_models')
     ANALYTICS_DIR = os.path.join(DATA_DIR, 'analytics')
+    STORAGE_DIRS = (DATA_DIR, CACHE_DIR, USER_DATA_DIR, ML_MODELS_DIR, ANALYTICS_DIR)
+    GITKEEP_DIRS = (CACHE_DIR, USER_DATA_DIR)
     
     # Cache Settings
     CACHE_EXPIRY = int(os.environ.get('CACHE_EXPIRY', 3600))  # 1 hour
@@ -27,27 +30,22 @@ class Config:
     # ML Settings
     SENTIMENT_MODEL_PATH = os.path.join(ML_MODELS_DIR, 'sentiment_model.pkl')
     RECOMMENDATION_MODEL_PATH = os.path.join(ML_MODELS_DIR, 'recommendation_model.pkl')
+    PRELOAD_NLTK_DATA = os.environ.get('PRELOAD_NLTK_DATA', '').lower() in ('1', 'true', 'yes')
     
     @staticmethod
     def init_app(app):
         # Create necessary directories
-        directories = [
-            Config.DATA_DIR,
-            Config.CACHE_DIR,
-            Config.USER_DATA_DIR,
-            Config.ML_MODELS_DIR,
-            Config.ANALYTICS_DIR
-        ]
+        for directory in Config.STORAGE_DIRS:
+            if not os.path.isdir(directory):
+                os.makedirs(directory, exist_ok=True)
         
-        for directory in directories:
-            os.makedirs(directory, exist_ok=True)
-            
         # Create .gitkeep files
-        for directory in [Config.CACHE_DIR, Config.USER_DATA_DIR]:
-            gitkeep_path = os.path.join(directory, '.gitkeep')
-            if not os.path.exists(gitkeep_path):
-                with open(gitkeep_path, 'w') as f:
-                    f.write('')
+        for directory in Config.GITKEEP_DIRS:
+            Path(directory, '.gitkeep').touch(exist_ok=True)
+        
+        # Bind storage settings once instead of on every FileManager()
+        from app.utils.file_manager import FileManager
+        FileManager.configure(app)
 
 class DevelopmentConfig(Config):
     DEBUG = True
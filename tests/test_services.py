@@ -0,0 +1,192 @@
+# tests/test_services.py
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from app import create_app
+from app.utils import file_manager
+from app.utils.file_manager import FileManager
+
+@pytest.fixture
+def manager(tmp_path):
+    """FileManager bound to a scratch data directory"""
+    app = create_app('testing')
+    for key, name in (('CACHE_DIR', 'cache'), ('USER_DATA_DIR', 'user_data'),
+                      ('ANALYTICS_DIR', 'analytics')):
+        directory = tmp_path / name
+        directory.mkdir()
+        app.config[key] = str(directory)
+    FileManager.configure(app)
+    
+    with app.app_context():
+        yield FileManager()
+    
+    _restart()
+
+@pytest.fixture
+def stalled_flusher(monkeypatch):
+    """Keep the background writer from flushing; tests flush explicitly"""
+    flush_all = file_manager._flush_all
+    monkeypatch.setattr(file_manager, '_flush_all', lambda: None)
+    flush_all()
+    time.sleep(0.05)  # let a flush already in progress finish
+
+def _restart():
+    """Close and forget the in-process analysis logs, as a fresh worker would"""
+    for log in file_manager._analysis_logs.values():
+        log.close()
+    file_manager._analysis_logs.clear()
+
+def test_threaded_analysis_saves_are_all_readable(manager):
+    def save(worker):
+        for i in range(50):
+            assert manager.save_user_analysis(f"analysis_{worker}_{i}", {'worker': worker, 'i': i})
+    
+    threads = [threading.Thread(target=save, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    for reload in (False, True):
+        if reload:
+            _restart()
+        for worker in range(8):
+            for i in range(50):
+                analysis = manager.get_user_analysis(f"analysis_{worker}_{i}")
+                assert analysis['data'] == {'worker': worker, 'i': i}
+
+def test_resaving_an_analysis_serves_the_latest_write(manager):
+    manager.save_user_analysis('shared', {'v': 1})
+    manager.save_user_analysis('shared', {'v': 2})
+    
+    assert manager.get_user_analysis('shared')['data'] == {'v': 2}
+    _restart()
+    assert manager.get_user_analysis('shared')['data'] == {'v': 2}
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_overwrite_from_another_process_is_seen(manager):
+    manager.save_user_analysis('shared', {'v': 'parent'})
+    assert manager.get_user_analysis('shared')['data'] == {'v': 'parent'}
+    
+    pid = os.fork()
+    if pid == 0:
+        ok = manager.save_user_analysis('shared', {'v': 'child'})
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    
+    assert manager.get_user_analysis('shared')['data'] == {'v': 'child'}
+
+def test_torn_tail_does_not_swallow_the_next_record(manager):
+    manager.save_user_analysis('before', {'v': 1})
+    
+    # A writer crashed halfway through a record
+    log = file_manager._analysis_log(manager.user_data_dir)
+    with open(log.log_path, 'ab') as f:
+        f.write(b'{"analysis_id":"torn","data":{"v"')
+    
+    manager.save_user_analysis('after_torn', {'v': 2})
+    assert manager.get_user_analysis('after_torn')['data'] == {'v': 2}
+    
+    # A restarted worker rebuilds the index from the log
+    _restart()
+    assert manager.get_user_analysis('before')['data'] == {'v': 1}
+    assert manager.get_user_analysis('after_torn')['data'] == {'v': 2}
+    assert manager.get_user_analysis('torn') is None
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_flushes_its_own_analytics(manager):
+    # Start the writer thread in the parent before forking
+    manager.save_analytics_data('parent', {})
+    file_manager._flush_all()
+    
+    pid = os.fork()
+    if pid == 0:
+        # Wait on the background writer only; iter_analytics would flush synchronously
+        ok = False
+        try:
+            for i in range(100):
+                manager.save_analytics_data('child', {'i': i})
+            time.sleep(0.5)
+            path = os.path.join(manager.analytics_dir, f"analytics_{datetime.now():%Y-%m-%d}.jsonl")
+            with open(path, 'rb') as f:
+                written = sum(1 for line in f if b'"child"' in line)
+            ok = written == 100 and not file_manager._analytics_queue
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+def test_iter_analytics_reads_days_in_the_legacy_format(manager):
+    legacy = {'events': [{'event_type': 'page_view', 'data': {'page': '/'}}]}
+    with open(os.path.join(manager.analytics_dir, 'analytics_2025-08-31.json'), 'w') as f:
+        json.dump(legacy, f, indent=2)
+    
+    assert list(manager.iter_analytics('2025-08-31')) == legacy['events']
+
+def test_cached_data_is_readable_before_and_after_the_flush(manager, stalled_flusher):
+    assert manager.cache_data('write_back', {'v': 1})
+    cache_path = manager._get_cache_path('write_back')
+    assert not os.path.exists(cache_path)
+    assert manager.get_cached_data('write_back') == {'v': 1}
+    
+    # Evicted from the in-memory LRU while still unwritten
+    file_manager._memory_cache.pop('write_back')
+    assert manager.get_cached_data('write_back') == {'v': 1}
+    
+    file_manager._flush_cache()
+    assert os.path.exists(cache_path) and not file_manager._dirty_cache
+    file_manager._memory_cache.pop('write_back', None)
+    assert manager.get_cached_data('write_back') == {'v': 1}
+
+def test_repeated_cache_writes_collapse_into_one_file_write(manager, stalled_flusher, monkeypatch):
+    writes = []
+    write_atomic = file_manager._write_atomic
+    monkeypatch.setattr(file_manager, '_write_atomic',
+                        lambda path, payload: writes.append(path) or write_atomic(path, payload))
+    
+    for i in range(10):
+        manager.cache_data('hot_key', {'v': i})
+    file_manager._flush_cache()
+    
+    assert writes == [manager._get_cache_path('hot_key')]
+    file_manager._memory_cache.pop('hot_key', None)
+    assert manager.get_cached_data('hot_key') == {'v': 9}
+
+def test_iter_analytics_sees_queued_events(manager, stalled_flusher):
+    for i in range(5):
+        manager.save_analytics_data('queued', {'i': i})
+    assert len(file_manager._analytics_queue) == 5
+    
+    assert [event['data']['i'] for event in manager.iter_analytics()] == list(range(5))
+    assert not file_manager._analytics_queue
+
+def test_full_analytics_queue_drops_events(manager, stalled_flusher, monkeypatch):
+    monkeypatch.setattr(file_manager, '_ANALYTICS_QUEUE_LIMIT', 3)
+    
+    assert [manager.save_analytics_data('burst', {'i': i}) for i in range(5)] == [True] * 3 + [False] * 2
+    assert len(file_manager._analytics_queue) == 3
+    file_manager._flush_analytics()
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_flushes_its_own_cache_writes(manager):
+    # Start the writer thread in the parent before forking
+    manager.cache_data('parent_key', {'v': 'parent'})
+    file_manager._flush_all()
+    
+    pid = os.fork()
+    if pid == 0:
+        ok = False
+        try:
+            manager.cache_data('child_key', {'v': 'child'})
+            time.sleep(0.5)
+            ok = os.path.exists(manager._get_cache_path('child_key')) and not file_manager._dirty_cache
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
\ No newline at end of file